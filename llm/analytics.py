@@ -0,0 +1,77 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+try:
+    from export import read_table
+except ImportError:
+    from llm.export import read_table
+
+# Everything here reads the Arrow snapshot written by `python -m llm.export`, never MySQL.
+
+
+def _counts(table: pa.Table, column: str) -> dict:
+    counts = pc.value_counts(table.column(column)).to_pylist()
+    return {c["values"]: c["counts"] for c in sorted(counts, key=lambda c: -c["counts"])}
+
+
+def category_distribution() -> dict:
+    return _counts(read_table("processed"), "category")
+
+
+def triage_mix() -> dict:
+    return _counts(read_table("processed"), "triage")
+
+
+def category_triage_matrix() -> pa.Table:
+    return (
+        read_table("processed")
+        .group_by(["category", "triage"])
+        .aggregate([("ticket_id", "count")])
+        .rename_columns(["category", "triage", "tickets"])
+        .sort_by([("category", "ascending"), ("triage", "ascending")])
+    )
+
+
+def assignment_load() -> pa.Table:
+    # Tickets per employee, with names, busiest first
+    load = (
+        read_table("assign")
+        .group_by("assigned_id")
+        .aggregate([("ticket_id", "count_distinct")])
+        .rename_columns(["employee_id", "tickets"])
+    )
+    employees = read_table("employee").select(["employee_id", "employee_name"])
+    return load.join(employees, "employee_id", join_type="left outer").sort_by([("tickets", "descending")])
+
+
+_load_counts = None
+
+
+def employee_load(employee_ids, refresh=False) -> np.ndarray:
+    # Snapshot ticket counts aligned with `employee_ids` (0 when unknown); input for load-balanced assignment
+    global _load_counts
+    if _load_counts is None or refresh:
+        _load_counts = (
+            read_table("assign")
+            .group_by("assigned_id")
+            .aggregate([("ticket_id", "count_distinct")])
+        )
+
+    positions = pc.index_in(pa.array(employee_ids, pa.string()), value_set=_load_counts.column("assigned_id"))
+    counts = _load_counts.column("ticket_id_count_distinct").combine_chunks().take(positions)
+    return pc.fill_null(counts, 0).to_numpy(zero_copy_only=False)
+
+
+# --- Report: python -m llm.analytics ---
+if __name__ == "__main__":
+    print("📊 Category distribution")
+    for category, n in category_distribution().items():
+        print(f"   {category:<20} {n}")
+
+    print("\n📊 Triage mix")
+    for triage, n in triage_mix().items():
+        print(f"   {triage:<20} {n}")
+
+    print("\n📊 Assignment load")
+    for row in assignment_load().to_pylist():
+        print(f"   {row['employee_id']:<10} {row['employee_name'] or '?':<25} {row['tickets']}")
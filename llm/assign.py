@@ -1,10 +1,14 @@
 import os
+from collections import Counter
 from dotenv import load_dotenv
 import mysql.connector
+import numpy as np
 try:
     from llm.models import Ticket, ProcessedTicket
+    from llm.analytics import employee_load
 except ImportError:
     from models import Ticket, ProcessedTicket
+    from analytics import employee_load
 
 load_dotenv()
 
@@ -13,6 +17,19 @@ D = os.getenv("MYSQL_DB")
 U = os.getenv("MYSQL_USER")
 P = os.getenv("MYSQL_PASSWORD")
 
+# Assignments made by this process since the last analytics snapshot
+session_load = Counter()
+
+def unassign_ticket(ticket_id: str, conn):
+    # Undo an assignment made on labels that turned out to be stale
+    cursor = conn.cursor()
+    cursor.execute("SELECT assigned_id FROM assign WHERE ticket_id = %s", (ticket_id,))
+    for (employee_id,) in cursor.fetchall():
+        if session_load[employee_id] > 0:
+            session_load[employee_id] -= 1
+    cursor.execute("DELETE FROM assign WHERE ticket_id = %s", (ticket_id,))
+    conn.commit()
+
 def assign_ticket(ticket_id: str, conn):
     try:
         cursor = conn.cursor()
@@ -33,19 +50,19 @@ def assign_ticket(ticket_id: str, conn):
 
         print(f"→ category: '{category}' | triage: '{triage}'")
 
-        # Step 2: Query for matching employee
+        # Step 2: Query for matching employees, pick the least loaded (snapshot + this session)
         cursor.execute("""
             SELECT employee_id FROM employee 
             WHERE TRIM(category) = %s AND TRIM(triage) = %s AND role = 'P'
-            LIMIT 1
         """, (category, triage))
-        id_find = cursor.fetchone()
+        candidates = [row[0] for row in cursor.fetchall()]
 
-        if not id_find:
+        if not candidates:
             print(f"[WARN] No employee found for category='{category}', triage='{triage}'")
             return False
 
-        employee_id = id_find[0]
+        load = employee_load(candidates) + np.array([session_load[c] for c in candidates])
+        employee_id = candidates[int(np.argmin(load))]
 
         # Step 3: Get assigned_date
         cursor.execute("""
@@ -61,6 +78,7 @@ def assign_ticket(ticket_id: str, conn):
             VALUES (%s, %s, %s)
         """, (ticket_id, employee_id, assigned_date))
         conn.commit()
+        session_load[employee_id] += 1
 
         # Step 5: Log assignment
         cursor.execute("SELECT employee_name FROM employee WHERE employee_id = %s", (employee_id,))
@@ -0,0 +1,91 @@
+import time
+import tracemalloc
+from datetime import date
+import numpy as np
+import pyarrow as pa
+try:
+    from models import Ticket, TicketRecord
+    from vectorstore.records import schema, to_record_batch
+except ImportError:
+    from llm.models import Ticket, TicketRecord
+    from llm.vectorstore.records import schema, to_record_batch
+
+# Microbenchmark for the per-ticket hot path: python -m llm.bench_hotpath
+N = 10_000
+
+rows = [
+    (f"TCK{i:05d}", "L3", "Payroll", f"Title {i}", f"Description for ticket {i}", "L3", "Open",
+     "Payroll", date(2025, 1, 1), "", None)
+    for i in range(N)
+]
+store_rows = [
+    {"ticket_id": r[0], "title": r[3], "description": r[4], "priority": "P2",
+     "category": r[7], "triage": r[5], "status": r[6]}
+    for r in rows
+]
+vectors = np.random.default_rng(0).random((N, 768), dtype=np.float32)
+
+
+def tickets_validated():
+    return [Ticket(
+        ticket_id=row[0], severity=row[1], module=row[2], title=row[3] or "", description=row[4] or "",
+        triage=row[5] or "", status=row[6], category=row[7] or "", reported_date=row[8],
+        assigned_to=row[9] or "", assigned_date=row[10]
+    ) for row in rows]
+
+
+def tickets_slotted():
+    return [TicketRecord(
+        ticket_id=row[0], severity=row[1], module=row[2], title=row[3] or "", description=row[4] or "",
+        triage=row[5] or "", status=row[6], category=row[7] or "", reported_date=row[8],
+        assigned_to=row[9] or "", assigned_date=row[10]
+    ) for row in rows]
+
+
+def records_as_dicts():
+    # Old embed_and_store: per-row dict + 768 Python floats, then LanceDB converts to Arrow
+    records = [{
+        "ticket_id": row["ticket_id"],
+        "title": row.get("title", ""),
+        "description": row.get("description", ""),
+        "priority": row.get("priority", ""),
+        "category": row.get("category", ""),
+        "triage": row.get("triage", "L5"),
+        "status": row.get("status", "unknown"),
+        "vector": vector.astype(np.float32).tolist()
+    } for row, vector in zip(store_rows, vectors)]
+    return pa.Table.from_pylist(records, schema=schema)
+
+
+def records_as_batch():
+    return pa.Table.from_batches([to_record_batch(store_rows, vectors)])
+
+
+def measure(fn, repeat=3):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow = pa.total_allocated_bytes() - arrow_before
+    del result
+    return elapsed, peak, arrow
+
+
+if __name__ == "__main__":
+    print(f"{N} tickets")
+    print(f"{'step':<34} {'ms':>9} {'py peak MB':>11} {'arrow MB':>9}")
+    for label, fn in (
+        ("Ticket(...) validated", tickets_validated),
+        ("TicketRecord (__slots__)", tickets_slotted),
+        ("dict records + tolist()", records_as_dicts),
+        ("Arrow batch, zero-copy vectors", records_as_batch),
+    ):
+        elapsed, peak, arrow = measure(fn)
+        print(f"{label:<34} {elapsed * 1000:>9.1f} {peak / 2**20:>11.1f} {arrow / 2**20:>9.1f}")
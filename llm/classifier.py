@@ -0,0 +1,179 @@
+import argparse
+import os
+import time
+import joblib
+import numpy as np
+from dotenv import load_dotenv
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+try:
+    from models import LocalPrediction
+    from rag import embedding_model, search_by_vector, search_similar_tickets
+    from knn import CLASSIFIER_CONFIDENCE, knn_vote, is_confident
+    from database import get_connection
+except ImportError:
+    from llm.models import LocalPrediction
+    from llm.rag import embedding_model, search_by_vector, search_similar_tickets
+    from llm.knn import CLASSIFIER_CONFIDENCE, knn_vote, is_confident
+    from llm.database import get_connection
+
+load_dotenv()
+
+# --- Config ---
+CLASSIFIER_PATH = os.getenv("CLASSIFIER_PATH", "ticket_classifier.joblib")
+LOCAL_REASON_PREFIX = "Local classifier"
+
+_model = None
+
+
+def load_model():
+    global _model
+    if _model is None and os.path.exists(CLASSIFIER_PATH):
+        _model = joblib.load(CLASSIFIER_PATH)
+    return _model
+
+
+# --- Prediction ---
+def logreg_predict(clf, vectors):
+    proba = clf.predict_proba(np.atleast_2d(vectors))
+    best = proba.argmax(axis=1)
+    return clf.classes_[best], proba[np.arange(len(best)), best]
+
+
+def predict(vector, neighbors) -> LocalPrediction:
+    model = load_model()
+    if model is not None:
+        triage, triage_conf = logreg_predict(model["triage"], vector)
+        category, category_conf = logreg_predict(model["category"], vector)
+        return LocalPrediction(
+            triage=triage[0], category=category[0],
+            triage_confidence=triage_conf[0], category_confidence=category_conf[0],
+            method="logreg"
+        )
+
+    triage, triage_conf = knn_vote(neighbors, "triage")
+    category, category_conf = knn_vote(neighbors, "category")
+    return LocalPrediction(
+        triage=triage, category=category,
+        triage_confidence=triage_conf, category_confidence=category_conf,
+        method="knn"
+    )
+
+
+def classify_ticket(title: str, description: str) -> LocalPrediction:
+    vector, neighbors = search_similar_tickets(title, description)
+    return predict(vector, neighbors)
+
+
+def local_labels(prediction: LocalPrediction) -> dict:
+    return {
+        "triage": prediction.triage,
+        "category": prediction.category,
+        "triage_reason": f"{LOCAL_REASON_PREFIX} ({prediction.method}), confidence {prediction.triage_confidence:.2f}",
+        "category_reason": f"{LOCAL_REASON_PREFIX} ({prediction.method}), confidence {prediction.category_confidence:.2f}",
+    }
+
+
+# --- Offline training / evaluation ---
+def fetch_labeled_tickets(source: str):
+    conn = get_connection()
+    cursor = conn.cursor()
+    if source == "ground":
+        cursor.execute("SELECT title, description, triage, category FROM ground")
+    else:
+        # LLM-labelled tickets, excluding ones the local classifier labelled itself
+        cursor.execute("""
+            SELECT m.title, m.description, p.triage, p.category
+            FROM processed p
+            JOIN main_table m ON m.ticket_id = p.ticket_id
+            LEFT JOIN reasons r ON r.ticket_id = p.ticket_id
+            WHERE r.triage_reason IS NULL OR r.triage_reason NOT LIKE %s
+        """, (f"{LOCAL_REASON_PREFIX}%",))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    texts = [f"{title}\n{description or ''}" for title, description, _, _ in rows]
+    triage = np.array([(t or "").strip() for _, _, t, _ in rows])
+    category = np.array([(c or "").strip() for _, _, _, c in rows])
+    return texts, triage, category
+
+
+def train(source: str):
+    texts, triage, category = fetch_labeled_tickets(source)
+    print(f"🧾 Training on {len(texts)} {source} tickets")
+    X = embedding_model.encode(texts, batch_size=64, show_progress_bar=True)
+
+    X_train, X_test, t_train, t_test, c_train, c_test = train_test_split(
+        X, triage, category, test_size=0.2, random_state=42
+    )
+    for name, y_train, y_test in (("triage", t_train, t_test), ("category", c_train, c_test)):
+        clf = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+        print(f"   {name:<8} holdout accuracy: {clf.score(X_test, y_test):.3f}")
+
+    model = {
+        "triage": LogisticRegression(max_iter=1000).fit(X, triage),
+        "category": LogisticRegression(max_iter=1000).fit(X, category),
+    }
+    joblib.dump(model, CLASSIFIER_PATH)
+    print(f"✅ Saved classifier to {CLASSIFIER_PATH}")
+    if source == "processed":
+        print("⚠️ Trained on LLM labels: `evaluate` will overlap the training data")
+
+
+def predict_knn(vector):
+    # kNN timing includes the LanceDB search, which the live path shares with the RAG context
+    neighbors = search_by_vector(vector)
+    triage, triage_conf = knn_vote(neighbors, "triage")
+    category, category_conf = knn_vote(neighbors, "category")
+    return triage, triage_conf, category, category_conf
+
+
+def evaluate():
+    # Agreement with the LLM's labels on processed tickets
+    texts, llm_triage, llm_category = fetch_labeled_tickets("processed")
+    print(f"🧾 Evaluating against {len(texts)} LLM-labelled tickets (threshold {CLASSIFIER_CONFIDENCE})")
+    X = embedding_model.encode(texts, batch_size=64, show_progress_bar=True)
+
+    results = {}
+    start = time.perf_counter()
+    knn = [predict_knn(vector) for vector in X]
+    knn_us = (time.perf_counter() - start) / max(len(X), 1) * 1e6
+    results["knn"] = (knn, knn_us)
+
+    model = load_model()
+    if model is not None:
+        start = time.perf_counter()
+        t_pred, t_conf = logreg_predict(model["triage"], X)
+        c_pred, c_conf = logreg_predict(model["category"], X)
+        logreg_us = (time.perf_counter() - start) / max(len(X), 1) * 1e6
+        results["logreg"] = (list(zip(t_pred, t_conf, c_pred, c_conf)), logreg_us)
+    else:
+        print(f"⚠️ No trained model at {CLASSIFIER_PATH}, run `train` first to include logistic regression")
+
+    print(f"\n{'method':<8} {'triage acc':>10} {'category acc':>12} {'coverage':>9} {'acc@conf':>9} {'µs/ticket':>10}")
+    for method, (preds, us) in results.items():
+        t_pred = np.array([p[0] for p in preds])
+        c_pred = np.array([p[2] for p in preds])
+        conf = np.array([min(p[1], p[3]) for p in preds])
+        both = (t_pred == llm_triage) & (c_pred == llm_category)
+        confident = conf >= CLASSIFIER_CONFIDENCE
+        acc_confident = both[confident].mean() if confident.any() else float("nan")
+        print(f"{method:<8} {(t_pred == llm_triage).mean():>10.3f} {(c_pred == llm_category).mean():>12.3f} "
+              f"{confident.mean():>9.3f} {acc_confident:>9.3f} {us:>10.1f}")
+    print("\ncoverage = share of tickets classified locally; acc@conf = both labels match the LLM on those")
+
+
+# --- CLI: python -m llm.classifier train|evaluate ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local triage/category classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train", help="fit logistic regression on labelled tickets")
+    train_cmd.add_argument("--source", choices=["ground", "processed"], default="ground")
+    sub.add_parser("evaluate", help="compare kNN / logistic regression with the LLM's labels")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train(args.source)
+    else:
+        evaluate()
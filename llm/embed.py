@@ -1,26 +1,20 @@
-import numpy as np
+import pyarrow as pa
 from sentence_transformers import SentenceTransformer
 try:
     from llm.vectorstore.vector_db import get_lance_table
+    from llm.vectorstore.records import to_record_batch
 except ImportError:
     from vectorstore.vector_db import get_lance_table
+    from vectorstore.records import to_record_batch
 
 embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
 table = get_lance_table()
 
 def embed_and_store(row: dict):
-    vector = embedding_model.encode(row.get("summary", "")).astype(np.float32).tolist()
+    embed_and_store_batch([row])
+    print(f"✅ Embedded & stored ticket: {row['ticket_id']}")
 
-    record = {
-        "ticket_id": row["ticket_id"],
-        "title": row.get("title", ""),
-        "description": row.get("description", ""),
-        "priority": row.get("priority",""),
-        "category": row.get("category", ""),
-        "triage": row.get("triage", "L5"),
-        "status": row.get("status", "unknown"),
-        "vector": vector
-    }
-
-    table.add([record])
-    print(f"✅ Embedded & stored ticket: {row['ticket_id']}")
\ No newline at end of file
+def embed_and_store_batch(rows: list):
+    # One encode call and one Arrow batch for all rows; vectors go to LanceDB without a Python-list detour
+    vectors = embedding_model.encode([row.get("summary", "") for row in rows])
+    table.add(pa.Table.from_batches([to_record_batch(rows, vectors)]))
\ No newline at end of file
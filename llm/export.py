@@ -0,0 +1,137 @@
+import argparse
+import os
+import shutil
+from glob import glob
+import numpy as np
+import pyarrow as pa
+from dotenv import load_dotenv
+try:
+    from database import get_connection
+except ImportError:
+    from llm.database import get_connection
+
+load_dotenv()
+
+# Uncompressed Arrow IPC files, so analytics can memory-map them without copying.
+# processed/reasons/assign are upserted in place, so each run diffs the exported columns against the
+# snapshot and appends new *and changed* rows; readers keep the latest row per key. If a key was
+# deleted in MySQL the table is rebuilt. --full compacts the parts back into one zero-copy file.
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics_data")
+
+# table -> (SELECT columns, key column, arrow schema)
+EXPORTS = {
+    "processed": ("ticket_id, triage, category", "ticket_id", pa.schema([
+        pa.field("ticket_id", pa.string()),
+        pa.field("triage", pa.string()),
+        pa.field("category", pa.string()),
+    ])),
+    "reasons": ("ticket_id, triage_reason, category_reason", "ticket_id", pa.schema([
+        pa.field("ticket_id", pa.string()),
+        pa.field("triage_reason", pa.string()),
+        pa.field("category_reason", pa.string()),
+    ])),
+    "assign": ("ticket_id, assigned_id, assigned_date", "ticket_id", pa.schema([
+        pa.field("ticket_id", pa.string()),
+        pa.field("assigned_id", pa.string()),
+        pa.field("assigned_date", pa.date32()),
+    ])),
+    "employee": ("employee_id, employee_name, category, triage, role", "employee_id", pa.schema([
+        pa.field("employee_id", pa.string()),
+        pa.field("employee_name", pa.string()),
+        pa.field("category", pa.string()),
+        pa.field("triage", pa.string()),
+        pa.field("role", pa.string()),
+    ])),
+}
+
+
+def table_dir(name):
+    return os.path.join(ANALYTICS_DIR, name)
+
+
+def read_table(name) -> pa.Table:
+    # Memory-mapped, zero-copy: the buffers point straight into the page cache
+    _, key, schema = EXPORTS[name]
+    parts = [
+        pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        for path in sorted(glob(os.path.join(table_dir(name), "part-*.arrow")))
+    ]
+    if not parts:
+        return schema.empty_table()
+    table = pa.concat_tables(parts)
+    if len(parts) == 1:
+        return table
+
+    # Later parts hold updated rows: keep the last row per key (this take() copies; --full avoids it)
+    latest = (
+        table.select([key])
+        .append_column("_row", pa.array(np.arange(table.num_rows)))
+        .group_by(key)
+        .aggregate([("_row", "max")])
+    )
+    return table.take(np.sort(latest.column("_row_max").to_numpy()))
+
+
+def write_part(name, table: pa.Table):
+    os.makedirs(table_dir(name), exist_ok=True)
+    part = len(glob(os.path.join(table_dir(name), "part-*.arrow")))
+    path = os.path.join(table_dir(name), f"part-{part:05d}.arrow")
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def export_table(conn, name, full=False):
+    columns, key, schema = EXPORTS[name]
+    if full:
+        shutil.rmtree(table_dir(name), ignore_errors=True)
+
+    # The exported projections are narrow, so read them whole and diff against the snapshot
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {columns} FROM {name}")
+    # Strip the padding the OLTP tables tend to carry
+    rows = [tuple(v.strip() if isinstance(v, str) else v for v in row) for row in cursor.fetchall()]
+    cursor.close()
+
+    snapshot = read_table(name)
+    exported = set(zip(*(snapshot.column(field.name).to_pylist() for field in schema)))
+    if exported:
+        current_keys = {row[0] for row in rows}
+        if any(row[0] not in current_keys for row in exported):
+            print(f"🔄 {name}: rows were deleted in MySQL, rebuilding")
+            return export_table(conn, name, full=True)
+    changed = [row for row in rows if row not in exported]
+
+    if not changed:
+        print(f"🟡 {name}: up to date")
+        return 0
+
+    # Column-wise build
+    table = pa.table({
+        field.name: pa.array([row[j] for row in changed], type=field.type)
+        for j, field in enumerate(schema)
+    }, schema=schema)
+    path = write_part(name, table)
+    print(f"✅ {name}: {len(changed)} new/changed rows -> {path}")
+    return len(changed)
+
+
+def export_all(full=False):
+    conn = get_connection()
+    try:
+        for name in EXPORTS:
+            # employee is a small dimension table, simplest to rebuild every time
+            export_table(conn, name, full=full or name == "employee")
+    finally:
+        conn.close()
+
+
+# --- CLI: python -m llm.export [--full] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Snapshot processed/reasons/assign/employee into Arrow files. Incremental runs append "
+                    "new and changed rows (latest row per key wins); deletions trigger a rebuild."
+    )
+    parser.add_argument("--full", action="store_true",
+                        help="rebuild and compact into one file per table (restores zero-copy reads)")
+    export_all(full=parser.parse_args().full)
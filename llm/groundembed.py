@@ -1,8 +1,8 @@
 import mysql.connector
 try:
-    from llm.embed import embed_and_store 
+    from llm.embed import embed_and_store_batch
 except ImportError:
-    from embed import embed_and_store
+    from embed import embed_and_store_batch
 from database import get_connection
 
 def embed_ground_tickets():
@@ -11,8 +11,7 @@ def embed_ground_tickets():
     cursor.execute("SELECT * FROM ground LIMIT 200")
     rows = cursor.fetchall()
 
-    for row in rows:
-        embed_and_store(row)
+    embed_and_store_batch(rows)
 
     cursor.close()
     conn.close()
@@ -2,7 +2,10 @@ import requests
 import os
 from dotenv import load_dotenv
 import time
-from llm.models import Ticket, ProcessedTicket
+try:
+    from llm.models import Ticket, ProcessedTicket
+except ImportError:
+    from models import Ticket, ProcessedTicket
 
 load_dotenv()
 GEMINI_API_URL = os.getenv("GEMINI_API_URL")
@@ -14,16 +17,6 @@ last_request_time = 0
 
 # HORSE 7
 def process_ticket(ticket: Ticket) -> ProcessedTicket:
-    global last_request_time
-
-    current_time = time.time()
-    time_since_last_request = current_time - last_request_time
-
-    if time_since_last_request < REQUEST_INTERVAL_SECONDS:
-        time_to_wait = REQUEST_INTERVAL_SECONDS - time_since_last_request
-        print(f"Rate limit approaching. Waiting for {time_to_wait:.2f} seconds...")
-        time.sleep(time_to_wait)
-
     prompt_text = f"""
     You are an expert IT support assistant, with expertise in all areas of IT. 
     Given the following ticket:
@@ -42,6 +35,35 @@ def process_ticket(ticket: Ticket) -> ProcessedTicket:
     do not use highlighting, markdown or code blocks. Do not communicate with the user directly.
     """
 
+    generated_text = generate_text(prompt_text)
+    print("Raw generated text from Gemini:")
+    print(f"generated_text for ticket {ticket.ticket_id}")
+    print("\n-------------------\n")
+
+    pres = parse_gemini_response(generated_text)
+    print("Parsed result:")
+    print(f"parsed result for ticket {ticket.ticket_id}")
+    print("\n-------------------\n")
+
+    return ProcessedTicket(
+        ticket_id=ticket.ticket_id,
+        summary=pres["summary"],
+        priority=pres["priority"],
+        category=pres["category"],
+        solution=pres["solution"]
+    )
+
+def generate_text(prompt_text: str) -> str:
+    global last_request_time
+
+    current_time = time.time()
+    time_since_last_request = current_time - last_request_time
+
+    if time_since_last_request < REQUEST_INTERVAL_SECONDS:
+        time_to_wait = REQUEST_INTERVAL_SECONDS - time_since_last_request
+        print(f"Rate limit approaching. Waiting for {time_to_wait:.2f} seconds...")
+        time.sleep(time_to_wait)
+
     headers = {
         "Content-Type": "application/json"
     }
@@ -60,23 +82,7 @@ def process_ticket(ticket: Ticket) -> ProcessedTicket:
 
     if response.status_code == 200:
         result = response.json()
-        generated_text = result["candidates"][0]["content"]["parts"][0]["text"]
-        print("Raw generated text from Gemini:")
-        print(f"generated_text for ticket {ticket.ticket_id}")
-        print("\n-------------------\n")
-
-        pres = parse_gemini_response(generated_text)
-        print("Parsed result:")
-        print(f"parsed result for ticket {ticket.ticket_id}")
-        print("\n-------------------\n")
-
-        return ProcessedTicket(
-            ticket_id=ticket.ticket_id,
-            summary=pres["summary"],
-            priority=pres["priority"],
-            category=pres["category"],
-            solution=pres["solution"]
-        )
+        return result["candidates"][0]["content"]["parts"][0]["text"]
     else:
         if response.status_code == 429:
             print(f"Received 429 Too Many Requests. Try increasing interval above 5s or consider batching requests.")
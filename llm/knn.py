@@ -0,0 +1,40 @@
+import os
+from collections import defaultdict
+from dotenv import load_dotenv
+try:
+    from models import LocalPrediction
+except ImportError:
+    from llm.models import LocalPrediction
+
+load_dotenv()
+
+# Pure voting/threshold logic for the local classifier, kept free of the embedding model and LanceDB.
+
+# --- Config ---
+# Cosine distance beyond which a neighbour isn't considered similar
+SIMILARITY_THRESHOLD = 0.3
+CLASSIFIER_CONFIDENCE = float(os.getenv("CLASSIFIER_CONFIDENCE", "0.8"))
+MIN_KNN_VOTES = 3
+
+
+def knn_vote(neighbors, field):
+    # Similarity-weighted vote over the nearest labelled tickets in LanceDB. Only neighbours the RAG
+    # context would also accept get a vote, so a handful of weak matches can't look unanimous.
+    votes = defaultdict(float)
+    count = 0
+    for res in neighbors:
+        distance = res.get("_distance", 1.0)
+        label = (res.get(field) or "").strip()
+        if label and distance <= SIMILARITY_THRESHOLD:
+            votes[label] += 1 - distance
+            count += 1
+
+    total = sum(votes.values())
+    if count < MIN_KNN_VOTES or not total:
+        return "", 0.0
+    label = max(votes, key=votes.get)
+    return label, votes[label] / total
+
+
+def is_confident(prediction: LocalPrediction) -> bool:
+    return min(prediction.triage_confidence, prediction.category_confidence) >= CLASSIFIER_CONFIDENCE
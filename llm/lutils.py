@@ -13,9 +13,15 @@ from langfuse.langchain import CallbackHandler
 try:
     from models import Ticket, ProcessedTicket
     from rag import get_similar_ticket_context
+    from router import LLMRouter, langchain_backend, blocking_backend
+    from stream_parser import IncrementalFieldParser
+    import handlers as gemini
 except ImportError:
     from llm.models import Ticket, ProcessedTicket
     from llm.rag import get_similar_ticket_context
+    from llm.router import LLMRouter, langchain_backend, blocking_backend
+    from llm.stream_parser import IncrementalFieldParser
+    import llm.handlers as gemini
 
 # Logging
 logging.basicConfig(filename='llm_logs.log', level=logging.INFO)
@@ -26,6 +32,14 @@ AZURE_API_KEY     = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_API_BASE    = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_DEPLOYMENT  = os.getenv("AZURE_DEPLOYMENT_NAME")
 AZURE_API_VERSION = os.getenv("AZURE_API_VERSION", "2024-12-01")
+AZURE_DEPLOYMENT_RPM = int(os.getenv("AZURE_DEPLOYMENT_RPM", "60"))
+# "deployment[:rpm],..." -- rpm defaults to AZURE_DEPLOYMENT_RPM
+AZURE_FALLBACK_DEPLOYMENTS = [
+    (name.strip(), int(rpm) if rpm.strip() else AZURE_DEPLOYMENT_RPM)
+    for name, _, rpm in (d.partition(":") for d in os.getenv("AZURE_FALLBACK_DEPLOYMENTS", "").split(","))
+    if name.strip()
+]
+LLM_HEDGING = os.getenv("LLM_HEDGING", "Y").upper() == "Y"
 
 if not all([AZURE_API_KEY, AZURE_API_BASE, AZURE_DEPLOYMENT]):
     raise ValueError("Missing Azure OpenAI credentials or configuration in .env")
@@ -41,22 +55,43 @@ llm = AzureChatOpenAI(
     api_version=AZURE_API_VERSION,
     api_key=AZURE_API_KEY,
     temperature=0.2,
+    include_response_headers=True,  # lets the router read x-ratelimit-remaining-requests
 )
 
-# Output format schema
+# Router over every deployment/provider we have credentials for. Azure backends are weighted by the
+# remaining-requests header once seen; Gemini (no such header) by a local estimate from its rpm.
+backends = [langchain_backend(AZURE_DEPLOYMENT, llm, AZURE_DEPLOYMENT_RPM)]
+for deployment, rpm in AZURE_FALLBACK_DEPLOYMENTS:
+    backends.append(langchain_backend(deployment, AzureChatOpenAI(
+        azure_endpoint=AZURE_API_BASE,
+        deployment_name=deployment,
+        api_version=AZURE_API_VERSION,
+        api_key=AZURE_API_KEY,
+        temperature=0.2,
+        include_response_headers=True,
+    ), rpm))
+if gemini.GEMINI_API_URL:
+    backends.append(blocking_backend("gemini", gemini.generate_text, 60 / gemini.REQUEST_INTERVAL_SECONDS))
+
+router = LLMRouter(backends, hedge=LLM_HEDGING)
+
+# Output format schema (triage/category first so a streamed response can be acted on early)
 response_schemas = [
-    ResponseSchema(name="summary", description="50–75 word summary of the issue."),
     ResponseSchema(name="triage", description="Assign priority: L1 to L5 only. L1 is the basic level(least prioritized), L2 is the next level to L1 (low priorirized), L3 is the next level to L2 (medium priority), L4 is a high prioritized ticket and L5 is a critical ticket(most prioritized) . No extra text."),
     ResponseSchema(name="category", description="Choose one: Payroll, Leave Management, Authentication, Reporting, Time Tracking, Notifications, User Management, Performance, Recruitment, Attendance, Dashboard, Globalization, Directory, Help, Leave, UI/UX, Documents, Integrations."),
+    ResponseSchema(name="summary", description="50–75 word summary of the issue."),
     ResponseSchema(name="solution", description="Provide a 1–2 sentence solution."),
     ResponseSchema(name="triage_reason", description="15-word explanation for triage level."),
     ResponseSchema(name="category_reason", description="15-word explanation for category.")
 ]
 output_parser = StructuredOutputParser.from_response_schemas(response_schemas)
 
+# Summary/solution only, for tickets the local classifier already labelled confidently
+summary_schemas = [schema for schema in response_schemas if schema.name in ("summary", "solution")]
+summary_output_parser = StructuredOutputParser.from_response_schemas(summary_schemas)
+
 # Prompt template
-prompt_template = PromptTemplate(
-    template="""
+PROMPT_TEXT = """
 You are an expert IT support assistant. Suppose you're given a ticket like this:
 
 Title: {title}
@@ -64,15 +99,92 @@ Description: {description}
 
 Return only these fields:
 {format_instructions}
-""",
+"""
+prompt_template = PromptTemplate(
+    template=PROMPT_TEXT,
     input_variables=["title", "description"],
     partial_variables={"format_instructions": output_parser.get_format_instructions()}
 )
+summary_prompt_template = PromptTemplate(
+    template=PROMPT_TEXT,
+    input_variables=["title", "description"],
+    partial_variables={"format_instructions": summary_output_parser.get_format_instructions()}
+)
 
 # Custom Exception
 class RateLimitExceeded(Exception):
     pass
 
+# Static prompt fragments, rendered once: each template (with format instructions) split around the two fields
+_TITLE, _DESCRIPTION = "\x00title\x00", "\x00description\x00"
+CONTEXT_HEADER = "\n\n====================\n📚 SIMILAR TICKET CONTEXT:\n"
+
+def render_fragments(template: PromptTemplate) -> tuple:
+    head, rest = template.format(title=_TITLE, description=_DESCRIPTION).split(_TITLE)
+    middle, tail = rest.split(_DESCRIPTION)
+    return head, middle, tail
+
+PROMPT_FRAGMENTS = render_fragments(prompt_template)
+SUMMARY_PROMPT_FRAGMENTS = render_fragments(summary_prompt_template)
+
+def build_prompt(ticket: Ticket, fragments=PROMPT_FRAGMENTS) -> str:
+    head, middle, tail = fragments
+    context = get_similar_ticket_context(ticket.title, ticket.description)
+    return "".join((
+        head, ticket.title, middle, ticket.description, tail,
+        CONTEXT_HEADER, context or "[No similar tickets found]"
+    ))
+
+def to_processed_ticket(ticket: Ticket, parsed: dict) -> ProcessedTicket:
+    return ProcessedTicket(
+        ticket_id       = ticket.ticket_id,
+        summary         = parsed["summary"],
+        triage          = parsed["triage"],
+        category        = parsed["category"],
+        solution        = parsed["solution"],
+        triage_reason   = parsed["triage_reason"],
+        category_reason = parsed["category_reason"]
+    )
+
+def start_trace(span, ticket: Ticket, full_prompt: str):
+    span.update_trace(
+        input={
+            "ticket_id": ticket.ticket_id,
+            "title": ticket.title,
+            "description": ticket.description,
+            "full_prompt": full_prompt
+        },
+        user_id="system",
+        session_id=f"ticket-{ticket.ticket_id}"
+    )
+
+def check_rate_limit(ticket: Ticket, raw_output: str):
+    if "rate limit" in raw_output.lower() or "quota exceeded" in raw_output.lower():
+        raise RateLimitExceeded(f"Rate limit hit for ticket {ticket.ticket_id}")
+
+async def invoke_and_parse(ticket: Ticket, fragments, parser, span_name: str) -> dict:
+    full_prompt = build_prompt(ticket, fragments)
+    logging.info("Prompt for ticket %s:\n%s", ticket.ticket_id, full_prompt)
+
+    with langfuse.start_as_current_span(name=span_name) as span:
+        start_trace(span, ticket, full_prompt)
+        handler = CallbackHandler()
+
+        try:
+            response = await router.ainvoke(full_prompt, config={"callbacks": [handler]})
+            raw_output = response.strip()
+            span.update_trace(output={"raw_output": raw_output})
+            check_rate_limit(ticket, raw_output)
+
+            parsed = parser.parse(raw_output)
+            span.update_trace(output={"parsed": parsed})
+            return parsed
+
+        except Exception as e:
+            logging.error("[ERROR] Failed processing ticket %s: %s", ticket.ticket_id, e)
+            span.update_trace(output={"error": str(e)})
+            raise
+
 # Retry logic with backoff
 @retry(
     wait=wait_exponential(multiplier=1, min=4, max=60),
@@ -80,57 +192,57 @@ class RateLimitExceeded(Exception):
     retry=retry_if_exception_type(RateLimitExceeded)
 )
 async def process_ticket_with_retry(ticket: Ticket) -> ProcessedTicket:
-    base_prompt = prompt_template.format(
-        title=ticket.title,
-        description=ticket.description
-    )
+    parsed = await invoke_and_parse(ticket, PROMPT_FRAGMENTS, output_parser, "process-ticket")
+    return to_processed_ticket(ticket, parsed)
 
-    context = get_similar_ticket_context(ticket.title, ticket.description)
-    full_prompt = (
-        f"{base_prompt}\n\n"
-        f"====================\n"
-        f"📚 SIMILAR TICKET CONTEXT:\n"
-        f"{context or '[No similar tickets found]'}"
+# Summary-only call for tickets whose triage/category (and reasons) come from `labels`
+@retry(
+    wait=wait_exponential(multiplier=1, min=4, max=60),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception_type(RateLimitExceeded)
+)
+async def summarize_ticket_with_retry(ticket: Ticket, labels: dict) -> ProcessedTicket:
+    parsed = await invoke_and_parse(ticket, SUMMARY_PROMPT_FRAGMENTS, summary_output_parser, "summarize-ticket")
+    return ProcessedTicket(
+        ticket_id = ticket.ticket_id,
+        summary   = parsed["summary"],
+        solution  = parsed["solution"],
+        **labels
     )
 
+# Streaming variant: `on_classified(ticket_id, triage, category)` is awaited as soon as
+# both fields have streamed in, before the long summary/solution fields are generated.
+@retry(
+    wait=wait_exponential(multiplier=1, min=4, max=60),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception_type(RateLimitExceeded)
+)
+async def stream_ticket_with_retry(ticket: Ticket, on_classified) -> ProcessedTicket:
+    full_prompt = build_prompt(ticket)
     logging.info("Prompt for ticket %s:\n%s", ticket.ticket_id, full_prompt)
 
-    with langfuse.start_as_current_span(name="process-ticket") as span:
-        span.update_trace(
-            input={
-                "ticket_id": ticket.ticket_id,
-                "title": ticket.title,
-                "description": ticket.description,
-                "full_prompt": full_prompt
-            },
-            user_id="system",
-            session_id=f"ticket-{ticket.ticket_id}"
-        )
-
+    with langfuse.start_as_current_span(name="process-ticket-stream") as span:
+        start_trace(span, ticket, full_prompt)
         handler = CallbackHandler()
 
         try:
-            response = await llm.ainvoke(full_prompt, config={"callbacks": [handler]})
-            raw_output = response.content.strip()
+            fields = IncrementalFieldParser()
+            classified = False
+            async for chunk in router.astream(full_prompt, config={"callbacks": [handler]}):
+                fields.feed(chunk)
+                if not classified and fields.has("triage", "category"):
+                    classified = True
+                    await on_classified(ticket.ticket_id, fields.fields["triage"].strip(), fields.fields["category"].strip())
+
+            raw_output = fields.buffer.strip()
             span.update_trace(output={"raw_output": raw_output})
-
-            if "rate limit" in raw_output.lower() or "quota exceeded" in raw_output.lower():
-                raise RateLimitExceeded(f"Rate limit hit for ticket {ticket.ticket_id}")
+            check_rate_limit(ticket, raw_output)
 
             parsed = output_parser.parse(raw_output)
             span.update_trace(output={"parsed": parsed})
-
-            return ProcessedTicket(
-                ticket_id       = ticket.ticket_id,
-                summary         = parsed["summary"],
-                triage          = parsed["triage"],
-                category        = parsed["category"],
-                solution        = parsed["solution"],
-                triage_reason   = parsed["triage_reason"],
-                category_reason = parsed["category_reason"]
-            )
+            return to_processed_ticket(ticket, parsed)
 
         except Exception as e:
-            logging.error("[ERROR] Failed processing ticket %s: %s", ticket.ticket_id, e)
+            logging.error("[ERROR] Failed streaming ticket %s: %s", ticket.ticket_id, e)
             span.update_trace(output={"error": str(e)})
             raise
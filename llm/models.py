@@ -21,6 +21,26 @@ class Ticket(BaseModel):
         return v
 
 
+class TicketRecord:
+    # Same fields as Ticket without pydantic: for trusted rows read from our own tables
+    __slots__ = ("ticket_id", "severity", "module", "title", "description", "triage", "status",
+                 "category", "reported_date", "assigned_to", "assigned_date")
+
+    def __init__(self, ticket_id, severity, module, title, description, triage, status,
+                 category, reported_date, assigned_to=None, assigned_date=None):
+        self.ticket_id = ticket_id
+        self.severity = severity
+        self.module = module
+        self.title = title
+        self.description = description
+        self.triage = triage
+        self.status = status
+        self.category = category
+        self.reported_date = reported_date
+        self.assigned_to = assigned_to
+        self.assigned_date = assigned_date
+
+
 class ProcessedTicket(BaseModel):
     ticket_id: str
     summary: str
@@ -28,4 +48,12 @@ class ProcessedTicket(BaseModel):
     category: str
     solution: str
     triage_reason: str
-    category_reason: str
\ No newline at end of file
+    category_reason: str
+
+
+class LocalPrediction(BaseModel):
+    triage: str
+    category: str
+    triage_confidence: float
+    category_confidence: float
+    method: str
@@ -1,21 +1,32 @@
+from functools import lru_cache
 from sentence_transformers import SentenceTransformer
 from llm.vectorstore.vector_db import get_lance_table
+from llm.knn import SIMILARITY_THRESHOLD
 
 embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
 table = get_lance_table()
 
-def get_similar_ticket_context(title: str, description: str, top_k=10, similarity_threshold=0.3):
-    query = f"{title}\n{description}"
-    query_vector = embedding_model.encode(query).tolist()
-
-    # Search top_k results
-    results = (
+def search_by_vector(query_vector, top_k=10):
+    return (
         table.search(query_vector)
         .distance_type("cosine")
         .limit(top_k)
         .to_list()
     )
 
+# Cached so the local classifier and the prompt context share one encode + search per ticket
+@lru_cache(maxsize=256)
+def search_similar_tickets(title: str, description: str, top_k=10):
+    query = f"{title}\n{description}"
+    query_vector = embedding_model.encode(query)
+    return query_vector, search_by_vector(query_vector, top_k)
+
+# Cached too: retries of the same ticket reuse the formatted context
+@lru_cache(maxsize=256)
+def get_similar_ticket_context(title: str, description: str, top_k=10, similarity_threshold=SIMILARITY_THRESHOLD):
+    # Search top_k results
+    _, results = search_similar_tickets(title, description, top_k)
+
     context_blocks = []
     for res in results:
         distance = res.get("_distance", 1.0)  # Default far away
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+
+# --- Config ---
+HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "8.0"))
+MIN_LATENCY_SAMPLES = 20
+LATENCY_WINDOW = 200
+QUOTA_WINDOW_SECONDS = 60
+UNHEALTHY_AFTER_FAILURES = int(os.getenv("LLM_UNHEALTHY_AFTER_FAILURES", "3"))
+UNHEALTHY_COOLDOWN_SECONDS = float(os.getenv("LLM_UNHEALTHY_COOLDOWN_SECONDS", "30"))
+
+
+class NoBackendAvailable(Exception):
+    pass
+
+
+# --- One deployment / provider ---
+class Backend:
+    def __init__(self, name, call, requests_per_minute, stream=None):
+        self.name = name
+        self.call = call  # async (prompt, config) -> str
+        self.stream = stream or self._stream_whole  # async iterator of str chunks
+        self.requests_per_minute = requests_per_minute
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.recent_calls = deque()
+        self.reported_remaining = None  # last x-ratelimit-remaining-requests from the provider
+        self.reported_at = 0.0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    async def _stream_whole(self, prompt, config=None):
+        yield await self.call(prompt, config)
+
+    def update_quota(self, remaining):
+        self.reported_remaining = remaining
+        self.reported_at = time.monotonic()
+
+    def remaining_quota(self, now):
+        while self.recent_calls and now - self.recent_calls[0] > QUOTA_WINDOW_SECONDS:
+            self.recent_calls.popleft()
+
+        # Prefer what the provider last reported, less our calls since then. Otherwise this is only
+        # an estimate from our own calls: other processes and main.py's rate limiter aren't visible here.
+        if self.reported_remaining is not None and now - self.reported_at <= QUOTA_WINDOW_SECONDS:
+            since = sum(1 for t in self.recent_calls if t > self.reported_at)
+            return max(0, self.reported_remaining - since)
+        return max(0, self.requests_per_minute - len(self.recent_calls))
+
+    def is_healthy(self, now):
+        return now >= self.unhealthy_until
+
+    def hedge_delay(self):
+        # Until we have enough samples the p95 is noise, so use the configured default
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE))]
+
+    def record_success(self, latency):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+
+    def record_cancelled(self, elapsed):
+        # A hedge loser cancelled past the hedge delay still tells us the call takes at least this long;
+        # dropping it would cut the sample off at the delay and drag p95 (and the next delay) down
+        if elapsed > self.hedge_delay():
+            self.latencies.append(elapsed)
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= UNHEALTHY_AFTER_FAILURES:
+            self.unhealthy_until = time.monotonic() + UNHEALTHY_COOLDOWN_SECONDS
+            logging.warning("[ROUTER] Draining backend %s for %.0fs after %d failures",
+                            self.name, UNHEALTHY_COOLDOWN_SECONDS, self.consecutive_failures)
+
+
+# --- Router over all backends ---
+class LLMRouter:
+    def __init__(self, backends, hedge=True):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self.hedge = hedge
+
+    def pick(self, exclude=(), fallback=True):
+        # fallback=False (hedges, failover): only a healthy backend with quota left, else None.
+        # fallback=True (the primary call): never give up while some backend exists.
+        now = time.monotonic()
+        candidates = [b for b in self.backends if b not in exclude]
+        if not candidates:
+            return None
+
+        healthy = [b for b in candidates if b.is_healthy(now)]
+        if not healthy:
+            if not fallback:
+                return None
+            # Everything is drained: try the one whose cooldown ends first rather than failing
+            return min(candidates, key=lambda b: b.unhealthy_until)
+
+        # Weighted by (reported or estimated) remaining quota in the current window
+        weights = [b.remaining_quota(now) for b in healthy]
+        if not any(weights):
+            if not fallback:
+                return None
+            weights = [1] * len(healthy)
+        return random.choices(healthy, weights=weights)[0]
+
+    async def _call(self, backend, prompt, config):
+        backend.recent_calls.append(time.monotonic())
+        start = time.monotonic()
+        try:
+            result = await backend.call(prompt, config)
+        except asyncio.CancelledError:
+            # Lost a hedge race, not a backend failure
+            backend.record_cancelled(time.monotonic() - start)
+            raise
+        except Exception:
+            backend.record_failure()
+            raise
+        backend.record_success(time.monotonic() - start)
+        return result
+
+    async def ainvoke(self, prompt, config=None):
+        primary = self.pick()
+        if primary is None:
+            raise NoBackendAvailable("No LLM backend configured")
+
+        pending = {asyncio.ensure_future(self._call(primary, prompt, config))}
+        hedged = not self.hedge
+        error = None
+
+        try:
+            while pending:
+                timeout = None if hedged else primary.hedge_delay()
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    logging.warning("[ROUTER] Backend call failed: %s", error)
+
+                # Primary is slower than its p95 (or already failed): fire a second call
+                if not hedged:
+                    hedged = True
+                    secondary = self.pick(exclude={primary}, fallback=False)
+                    if secondary is not None:
+                        logging.info("[ROUTER] Hedging %s with %s", primary.name, secondary.name)
+                        pending.add(asyncio.ensure_future(self._call(secondary, prompt, config)))
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, prompt, config=None):
+        # No hedging: a half-consumed stream can't be swapped, so only fail over before the first chunk
+        tried = set()
+        error = NoBackendAvailable("No LLM backend configured")
+        while True:
+            # Fail over only to backends that are healthy and have quota; the first pick may fall back
+            backend = self.pick(exclude=tried, fallback=not tried)
+            if backend is None:
+                raise error
+            tried.add(backend)
+
+            backend.recent_calls.append(time.monotonic())
+            start = time.monotonic()
+            started = False
+            try:
+                async for chunk in backend.stream(prompt, config):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                backend.record_failure()
+                if started:
+                    raise
+                logging.warning("[ROUTER] Stream from %s failed before first chunk: %s", backend.name, e)
+                error = e
+                continue
+            backend.record_success(time.monotonic() - start)
+            return
+
+
+# --- Provider adapters ---
+def remaining_from_headers(metadata):
+    # Azure/OpenAI send x-ratelimit-remaining-requests; the chat model must set include_response_headers=True
+    value = (metadata or {}).get("headers", {}).get("x-ratelimit-remaining-requests")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def langchain_backend(name, chat_model, requests_per_minute):
+    async def call(prompt, config=None):
+        response = await chat_model.ainvoke(prompt, config=config)
+        remaining = remaining_from_headers(response.response_metadata)
+        if remaining is not None:
+            backend.update_quota(remaining)
+        return response.content
+
+    async def stream(prompt, config=None):
+        async for chunk in chat_model.astream(prompt, config=config):
+            remaining = remaining_from_headers(chunk.response_metadata)
+            if remaining is not None:
+                backend.update_quota(remaining)
+            if chunk.content:
+                yield chunk.content
+
+    backend = Backend(name, call, requests_per_minute, stream=stream)
+    return backend
+
+
+def blocking_backend(name, generate, requests_per_minute):
+    # For sync clients (e.g. the Gemini REST handler); a cancelled call is abandoned in its thread
+    async def call(prompt, config=None):
+        return await asyncio.to_thread(generate, prompt)
+    return Backend(name, call, requests_per_minute)
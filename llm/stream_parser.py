@@ -0,0 +1,28 @@
+import json
+import re
+
+# A complete `"key": "value"` pair. Only matches once the closing quote of the value has arrived.
+FIELD_PATTERN = re.compile(r'"(\w+)"\s*:\s*"((?:[^"\\]|\\.)*)"', re.S)
+
+
+class IncrementalFieldParser:
+    """Pulls string fields out of a streamed JSON object as soon as each one is complete."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.fields = {}
+
+    def feed(self, chunk: str) -> dict:
+        self.buffer += chunk
+        new_fields = {}
+        for match in FIELD_PATTERN.finditer(self.buffer, self.pos):
+            # strict=False like langchain's final parse: models emit raw newlines/tabs inside values
+            key, value = match.group(1), json.loads(f'"{match.group(2)}"', strict=False)
+            self.fields[key] = value
+            new_fields[key] = value
+            self.pos = match.end()
+        return new_fields
+
+    def has(self, *keys) -> bool:
+        return all(key in self.fields for key in keys)
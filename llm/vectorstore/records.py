@@ -0,0 +1,35 @@
+import numpy as np
+import pyarrow as pa
+
+EMBEDDING_DIM = 768
+
+schema = pa.schema([
+    pa.field("ticket_id", pa.string()),
+    pa.field("title", pa.string()),
+    pa.field("description", pa.string()),
+    pa.field("priority", pa.string()),
+    pa.field("category", pa.string()),
+    pa.field("triage", pa.string()),
+    pa.field("status", pa.string()),
+    pa.field("vector", pa.list_(pa.float32(), EMBEDDING_DIM)),
+])
+
+# Used when a row doesn't carry the field
+DEFAULTS = {
+    "title": "",
+    "description": "",
+    "priority": "",
+    "category": "",
+    "triage": "L5",
+    "status": "unknown",
+}
+
+
+def to_record_batch(rows, vectors, defaults=DEFAULTS) -> pa.RecordBatch:
+    # (n, 768) float32 -> fixed-size-list column over the same buffer, no per-float Python objects
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(rows), EMBEDDING_DIM)
+    columns = [pa.array([row["ticket_id"] for row in rows], pa.string())]
+    for name in ("title", "description", "priority", "category", "triage", "status"):
+        columns.append(pa.array([row.get(name, defaults[name]) for row in rows], pa.string()))
+    columns.append(pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), EMBEDDING_DIM))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
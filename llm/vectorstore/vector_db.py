@@ -6,17 +6,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import pyarrow as pa
-
-schema = pa.schema([
-    pa.field("ticket_id", pa.string()),
-    pa.field("title", pa.string()),
-    pa.field("description", pa.string()),
-    pa.field("priority", pa.string()),
-    pa.field("category", pa.string()),
-    pa.field("triage", pa.string()),
-    pa.field("status", pa.string()),
-    pa.field("vector", pa.list_(pa.float32(), 768)),
-])
+try:
+    from llm.vectorstore.records import DEFAULTS, to_record_batch
+except ImportError:
+    from vectorstore.records import DEFAULTS, to_record_batch
 
 
 LANCE_DB_PATH = os.getenv("LANCE_DB_PATH", "ticketbackend/lancedb_data")
@@ -46,20 +39,11 @@ def get_lance_table():
 def add_ticket_to_lance(ticket: dict):
     table = get_lance_table()
     summary_text = ticket.get("summary", "")
-    vector = embedding_model.encode(summary_text).tolist()
-    existing = table.search(embedding_model.encode(ticket["summary"]).tolist()).limit(1).to_list()
+    vector = embedding_model.encode(summary_text)
+    existing = table.search(vector).limit(1).to_list()
     if any(row["ticket_id"] == ticket["ticket_id"] for row in existing):
         print("🟡 Ticket already embedded.")
         return
 
-    row = {
-        "ticket_id": ticket["ticket_id"],
-        "title": ticket.get("title", ""),
-        "description": ticket.get("description", ""),
-        "priority": ticket.get("priority", ""),
-        "category": ticket.get("category", "unknown"),
-        "triage": ticket.get("triage", "L5"),
-        "status": ticket.get("status", "unknown"),
-        "vector": vector
-    }
-    table.add([row])
+    batch = to_record_batch([ticket], vector, defaults={**DEFAULTS, "category": "unknown"})
+    table.add(pa.Table.from_batches([batch]))
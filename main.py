@@ -1,8 +1,8 @@
 import mysql.connector
 import asyncio
-from llm.lutils import process_ticket_with_retry as _base_process_ticket, RateLimitExceeded
-from llm.models import Ticket
-from llm.assign import assign_ticket
+from llm.lutils import process_ticket_with_retry as _base_process_ticket, stream_ticket_with_retry as _base_stream_ticket, summarize_ticket_with_retry as _base_summarize_ticket, RateLimitExceeded
+from llm.models import TicketRecord, ProcessedTicket
+from llm.assign import assign_ticket, unassign_ticket
 import os
 import time
 from dotenv import load_dotenv
@@ -11,6 +11,7 @@ from sentence_transformers import SentenceTransformer
 import lancedb
 from llm.checksql import is_ticket_embedded, mark_ticket_as_embedded
 from llm.embed import embed_and_store
+from llm.classifier import classify_ticket, is_confident, local_labels
 
 load_dotenv()
 
@@ -28,8 +29,15 @@ print("¯" * 40)
 MAX_CONCURRENT_LLM_REQUESTS = 5
 MAX_REQUESTS_PER_MINUTE = 60
 MIN_INTERVAL_BETWEEN_CALLS = 60 / MAX_REQUESTS_PER_MINUTE
+STREAM_LLM_RESPONSES = os.getenv("STREAM_LLM_RESPONSES", "N").upper() == "Y"
+# Opt-in: run `python -m llm.classifier evaluate` before trusting its labels over the LLM's
+USE_LOCAL_CLASSIFIER = os.getenv("USE_LOCAL_CLASSIFIER", "N").upper() == "Y"
+LLM_SUMMARIES = os.getenv("LLM_SUMMARIES", "Y").upper() == "Y"  # N: confident tickets skip the LLM entirely
 last_call_time = 0
 rate_limiter_lock = asyncio.Lock()
+# ticket_id -> (triage, category) it was assigned with before the LLM finished (stream or local
+# classifier); survives the outer retry loop
+early_assigned = {}
 
 # --- Define additional retryable exceptions ---
 class DeadlineExceeded(Exception): pass
@@ -41,8 +49,12 @@ class TemporaryServerError(Exception): pass
     wait=wait_exponential(multiplier=2, min=2, max=30),
     retry=retry_if_exception_type((RateLimitExceeded, DeadlineExceeded, TemporaryServerError))
 )
-async def process_ticket_with_retry(ticket):
+async def process_ticket_with_retry(ticket, on_classified=None, labels=None):
     try:
+        if labels is not None:
+            return await _base_summarize_ticket(ticket, labels)
+        if on_classified is not None:
+            return await _base_stream_ticket(ticket, on_classified)
         return await _base_process_ticket(ticket)
     except Exception as e:
         if "504" in str(e) or "deadline" in str(e).lower():
@@ -51,61 +63,114 @@ async def process_ticket_with_retry(ticket):
             raise TemporaryServerError(str(e))
         raise
 
+# --- Early write: triage/category are enough to assign ---
+def store_classification_and_assign(db_conn, ticket_id, triage, category):
+    cursor = db_conn.cursor()
+    cursor.execute("""
+        INSERT INTO processed (ticket_id, summary, triage, category, solution)
+        VALUES (%s, '', %s, %s, '')
+        ON DUPLICATE KEY UPDATE
+            triage=VALUES(triage),
+            category=VALUES(category)
+    """, (ticket_id, triage, category))
+    db_conn.commit()
+    print(f"⚡ Early classification for {ticket_id}: {triage} | {category}")
+
+    assigned = assign_ticket(ticket_id, db_conn)
+    if not assigned:
+        print(f"⚠️ [WARN] Ticket {ticket_id} not assigned.")
+
+# --- Final write: summary/solution/reasons ---
+def store_processed(db_conn, processed: ProcessedTicket):
+    cursor = db_conn.cursor()
+
+    cursor.execute("""
+        INSERT INTO processed (ticket_id, summary, triage, category, solution)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            summary=VALUES(summary),
+            triage=VALUES(triage),
+            category=VALUES(category),
+            solution=VALUES(solution)
+    """, (
+        processed.ticket_id,
+        processed.summary,
+        processed.triage.strip(),
+        processed.category.strip(),
+        processed.solution
+    ))
+    db_conn.commit()
+
+    cursor.execute("""
+        INSERT INTO reasons (ticket_id, triage_reason, category_reason)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            triage_reason = VALUES(triage_reason),
+            category_reason = VALUES(category_reason)
+    """, (processed.ticket_id, processed.triage_reason, processed.category_reason))
+    db_conn.commit()
+
+    if processed.summary:
+        cursor.execute("""
+            UPDATE metrics SET summarized = 'Y'
+            WHERE ticket_id = %s
+        """, (processed.ticket_id,))
+        db_conn.commit()
+
+    print(f"📥 Inserted/Updated processed ticket {processed.ticket_id}")
+
 # --- Process a Single Ticket ---
-async def process_and_store_single_ticket(ticket: Ticket, semaphore: asyncio.Semaphore, db_conn):
+async def process_and_store_single_ticket(ticket: TicketRecord, semaphore: asyncio.Semaphore, db_conn):
     global last_call_time
-    async with semaphore:
-        async with rate_limiter_lock:
-            elapsed = time.time() - last_call_time
-            wait_time = max(0, MIN_INTERVAL_BETWEEN_CALLS - elapsed)
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-            last_call_time = time.time()
 
+    async def on_classified(ticket_id, triage, category):
+        if ticket_id in early_assigned:
+            return
+        early_assigned[ticket_id] = (triage, category)
+        store_classification_and_assign(db_conn, ticket_id, triage, category)
+
+    async with semaphore:
         try:
+            # Fast path: a confident local prediction assigns without waiting for the LLM
+            prediction = classify_ticket(ticket.title, ticket.description) if USE_LOCAL_CLASSIFIER else None
+            local = prediction is not None and is_confident(prediction)
+            if local:
+                print(f"🎯 Local {prediction.method} classifier for {ticket.ticket_id} "
+                      f"({prediction.triage_confidence:.2f} / {prediction.category_confidence:.2f})")
+                await on_classified(ticket.ticket_id, prediction.triage, prediction.category)
+                if not LLM_SUMMARIES:
+                    processed = ProcessedTicket(ticket_id=ticket.ticket_id, summary="", solution="", **local_labels(prediction))
+                    store_processed(db_conn, processed)
+                    return processed
+
+            async with rate_limiter_lock:
+                elapsed = time.time() - last_call_time
+                wait_time = max(0, MIN_INTERVAL_BETWEEN_CALLS - elapsed)
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                last_call_time = time.time()
+
             print(f"🚀 Processing ticket: {ticket.ticket_id}")
-            processed = await process_ticket_with_retry(ticket)
+            if local:
+                # Labels are settled; the LLM only writes summary/solution (smaller prompt and completion)
+                processed = await process_ticket_with_retry(ticket, labels=local_labels(prediction))
+            else:
+                processed = await process_ticket_with_retry(ticket, on_classified if STREAM_LLM_RESPONSES else None)
             print(f"✅ Processed ticket {ticket.ticket_id}")
 
-            cursor = db_conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO processed (ticket_id, summary, triage, category, solution)
-                VALUES (%s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    summary=VALUES(summary),
-                    triage=VALUES(triage),
-                    category=VALUES(category),
-                    solution=VALUES(solution)
-            """, (
-                processed.ticket_id,
-                processed.summary,
-                processed.triage.strip(),
-                processed.category.strip(),
-                processed.solution
-            ))
-            db_conn.commit()
-
-            cursor.execute("""
-                INSERT INTO reasons (ticket_id, triage_reason, category_reason)
-                VALUES (%s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    triage_reason = VALUES(triage_reason),
-                    category_reason = VALUES(category_reason)
-            """, (processed.ticket_id, processed.triage_reason, processed.category_reason))
-            db_conn.commit()
-
-            cursor.execute("""
-                UPDATE metrics SET summarized = 'Y'
-                WHERE ticket_id = %s
-            """, (processed.ticket_id,))
-            db_conn.commit()
-
-            print(f"📥 Inserted/Updated processed ticket {processed.ticket_id}")
-
-            assigned = assign_ticket(processed.ticket_id, db_conn)
-            if not assigned:
-                print(f"⚠️ [WARN] Ticket {processed.ticket_id} not assigned.")
+            store_processed(db_conn, processed)
+
+            # A retried attempt can stream different labels than the ones we assigned on
+            labels = (processed.triage.strip(), processed.category.strip())
+            early = early_assigned.get(processed.ticket_id)
+            if early != labels:
+                if early is not None:
+                    print(f"🔁 Labels for {processed.ticket_id} changed from {early} to {labels}, reassigning")
+                    unassign_ticket(processed.ticket_id, db_conn)
+                early_assigned[processed.ticket_id] = labels
+                assigned = assign_ticket(processed.ticket_id, db_conn)
+                if not assigned:
+                    print(f"⚠️ [WARN] Ticket {processed.ticket_id} not assigned.")
 
             return processed
 
@@ -124,11 +189,12 @@ async def process_all_tickets():
     """)
     rows = cursor.fetchall()
 
-    tickets = [Ticket(
+    # Rows come straight from our own main_table, so skip pydantic validation
+    tickets = [TicketRecord(
         ticket_id=row[0],
         severity=row[1],
         module=row[2],
-        title=row[3],
+        title=row[3] or "",
         description=row[4] or "",
         triage=row[5] or "",
         status=row[6],
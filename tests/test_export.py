@@ -0,0 +1,111 @@
+import os
+from glob import glob
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from llm import export
+
+
+class StubCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=()):
+        pass
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+    """Serves the current contents of one table, as the export's SELECT would see them."""
+
+    def __init__(self, rows):
+        self.rows = rows  # key -> row tuple, mutated by the tests between exports
+
+    def cursor(self):
+        return StubCursor(self.rows.values())
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def analytics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "ANALYTICS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def parts(name):
+    return glob(os.path.join(export.table_dir(name), "part-*.arrow"))
+
+
+def snapshot(name):
+    return {row["ticket_id"]: row for row in export.read_table(name).to_pylist()}
+
+
+def test_in_place_update_is_exported():
+    conn = StubConnection({"T1": ("T1", "P2", "Network"), "T2": ("T2", "P3", "Hardware")})
+    assert export.export_table(conn, "processed") == 2
+    assert export.export_table(conn, "processed") == 0
+
+    conn.rows["T1"] = ("T1", "P1", "Network")
+    assert export.export_table(conn, "processed") == 1
+    assert snapshot("processed")["T1"]["triage"] == "P1"
+    assert snapshot("processed")["T2"]["triage"] == "P3"
+
+
+def test_value_changed_back_is_exported():
+    conn = StubConnection({"T1": ("T1", "P2", "Network")})
+    export.export_table(conn, "processed")
+
+    conn.rows["T1"] = ("T1", "P2", "Access")
+    assert export.export_table(conn, "processed") == 1
+    # Back to A: the row equals an older part, but it isn't the latest one any more
+    conn.rows["T1"] = ("T1", "P2", "Network")
+    assert export.export_table(conn, "processed") == 1
+    assert snapshot("processed")["T1"]["category"] == "Network"
+
+
+def test_deleted_key_rebuilds_table():
+    conn = StubConnection({"T1": ("T1", "P2", "Network"), "T2": ("T2", "P3", "Hardware")})
+    export.export_table(conn, "processed")
+    conn.rows["T3"] = ("T3", "P1", "Access")
+    export.export_table(conn, "processed")
+    assert len(parts("processed")) == 2
+
+    del conn.rows["T2"]
+    assert export.export_table(conn, "processed") == 2
+    assert len(parts("processed")) == 1
+    assert set(snapshot("processed")) == {"T1", "T3"}
+
+
+def test_read_table_keeps_latest_row_per_key():
+    conn = StubConnection({"T1": ("T1", "P2", "Network"), "T2": ("T2", "P3", "Hardware")})
+    export.export_table(conn, "processed")
+    conn.rows["T1"] = ("T1", "P1", "Network")
+    export.export_table(conn, "processed")
+    conn.rows["T2"] = ("T2", "P3", "Software")
+    conn.rows["T1"] = ("T1", "P4", "Network")
+    export.export_table(conn, "processed")
+
+    assert len(parts("processed")) == 3
+    table = export.read_table("processed")
+    assert table.num_rows == 2
+    assert sorted(table.column("ticket_id").to_pylist()) == ["T1", "T2"]
+    assert snapshot("processed")["T1"]["triage"] == "P4"
+    assert snapshot("processed")["T2"]["category"] == "Software"
+
+
+def test_padding_is_stripped():
+    conn = StubConnection({"T1": ("T1  ", " P2", "Network ")})
+    export.export_table(conn, "processed")
+    assert export.read_table("processed").to_pylist() == [
+        {"ticket_id": "T1", "triage": "P2", "category": "Network"}
+    ]
+    assert export.export_table(conn, "processed") == 0
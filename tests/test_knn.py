@@ -0,0 +1,53 @@
+import pytest
+
+from llm import knn
+from llm.knn import MIN_KNN_VOTES, SIMILARITY_THRESHOLD, is_confident, knn_vote
+from llm.models import LocalPrediction
+
+
+def neighbor(category, distance):
+    return {"category": category, "_distance": distance}
+
+
+def test_too_few_close_neighbors_abstains():
+    neighbors = [neighbor("Network", 0.1)] * (MIN_KNN_VOTES - 1)
+    assert knn_vote(neighbors, "category") == ("", 0.0)
+
+
+def test_far_neighbors_are_ignored():
+    far = SIMILARITY_THRESHOLD + 0.05
+    neighbors = [neighbor("Network", 0.1)] * 3 + [neighbor("Hardware", far)] * 7
+    assert knn_vote(neighbors, "category") == ("Network", 1.0)
+
+    # Far votes don't count towards the minimum either
+    neighbors = [neighbor("Network", 0.1)] * 2 + [neighbor("Network", far)] * 5
+    assert knn_vote(neighbors, "category") == ("", 0.0)
+
+
+def test_missing_labels_and_distances_are_ignored():
+    neighbors = [neighbor("Network", 0.1)] * 2 + [neighbor("", 0.0), {"category": "Network"}]
+    assert knn_vote(neighbors, "category") == ("", 0.0)
+
+
+def test_weighted_majority_confidence(monkeypatch):
+    # Network: 0.9 + 0.9 + 0.8 = 2.6, Hardware: 0.7 -> 2.6 / 3.3
+    neighbors = [
+        neighbor("Network", 0.1), neighbor("Network", 0.1),
+        neighbor("Network", 0.2), neighbor("Hardware", 0.3),
+    ]
+    label, confidence = knn_vote(neighbors, "category")
+    assert label == "Network"
+    assert confidence == pytest.approx(2.6 / 3.3)
+
+    monkeypatch.setattr(knn, "CLASSIFIER_CONFIDENCE", 0.8)
+
+    def prediction(category_confidence):
+        return LocalPrediction(triage="P3", category=label, triage_confidence=0.95,
+                               category_confidence=category_confidence, method="knn")
+
+    assert confidence < 0.8
+    assert not is_confident(prediction(confidence))
+    assert is_confident(prediction(0.8))
+    # The weaker of the two labels decides
+    assert not is_confident(LocalPrediction(triage="P3", category=label, triage_confidence=0.5,
+                                            category_confidence=0.95, method="knn"))
@@ -0,0 +1,102 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from llm import router as router_module
+from llm.router import Backend, LLMRouter
+
+
+def fake_backend(name, base, tail=None, tail_rate=0.0, fail_rate=0.0):
+    async def call(prompt, config=None):
+        backend.calls += 1
+        if random.random() < fail_rate:
+            raise RuntimeError(f"{name} unavailable")
+        await asyncio.sleep(tail if random.random() < tail_rate else base)
+        return name
+
+    backend = Backend(name, call, requests_per_minute=10_000)
+    backend.calls = 0
+    return backend
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def run(router, n):
+    async def go():
+        latencies, winners = [], {}
+        for _ in range(n):
+            start = time.monotonic()
+            winner = await router.ainvoke("ping")
+            latencies.append(time.monotonic() - start)
+            winners[winner] = winners.get(winner, 0) + 1
+        return latencies, winners
+    return asyncio.run(go())
+
+
+@pytest.fixture(autouse=True)
+def short_hedge_delay(monkeypatch):
+    monkeypatch.setattr(router_module, "DEFAULT_HEDGE_DELAY_SECONDS", 0.05)
+    random.seed(7)
+
+
+def test_hedging_cuts_tail_latency():
+    profiles = [("fast-spiky", 0.005, 0.200, 0.08), ("steady", 0.015, 0.030, 0.02)]
+    p99 = {}
+    for hedge in (False, True):
+        router = LLMRouter([fake_backend(*p) for p in profiles], hedge=hedge)
+        latencies, _ = run(router, 400)
+        p99[hedge] = percentile(latencies, 0.99)
+
+    assert p99[True] < p99[False]
+    assert p99[True] < 0.150
+
+
+def test_failing_backend_is_drained():
+    flaky = fake_backend("flaky", 0.005, fail_rate=1.0)
+    router = LLMRouter([flaky, fake_backend("steady", 0.015)])
+    _, winners = run(router, 50)
+
+    assert not flaky.is_healthy(time.monotonic())
+    assert winners == {"steady": 50}
+    assert flaky.calls == router_module.UNHEALTHY_AFTER_FAILURES
+
+
+def test_reported_zero_quota_gets_no_traffic():
+    full, empty = fake_backend("full", 0.001), fake_backend("empty", 0.001)
+    full.update_quota(100)
+    empty.update_quota(0)
+    _, winners = run(LLMRouter([full, empty], hedge=False), 50)
+
+    assert winners == {"full": 50}
+
+
+def test_no_hedge_to_drained_or_exhausted_backend():
+    slow = fake_backend("slow", 0.08)
+    drained = fake_backend("drained", 0.001)
+    drained.unhealthy_until = time.monotonic() + 3600
+    _, winners = run(LLMRouter([slow, drained]), 5)
+    assert drained.calls == 0
+    assert winners == {"slow": 5}
+
+    slow = fake_backend("slow", 0.08)
+    exhausted = fake_backend("exhausted", 0.001)
+    exhausted.update_quota(0)
+    run(LLMRouter([slow, exhausted]), 5)
+    assert exhausted.calls == 0
+
+
+def test_cancelled_hedge_loser_records_lower_bound_latency():
+    slow, fast = fake_backend("slow", 0.2), fake_backend("fast", 0.001)
+    router = LLMRouter([slow, fast])
+    # slow is always the primary, fast always the hedge
+    router.pick = lambda exclude=(), fallback=True: fast if slow in exclude else slow
+    _, winners = run(router, 3)
+
+    assert winners == {"fast": 3}
+    assert len(slow.latencies) == 3
+    assert min(slow.latencies) >= router_module.DEFAULT_HEDGE_DELAY_SECONDS
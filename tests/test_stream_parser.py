@@ -0,0 +1,40 @@
+from llm.stream_parser import IncrementalFieldParser
+
+OUTPUT = (
+    '```json\n{\n'
+    '    "triage": "L3",\n'
+    '    "category": "Payroll",\n'
+    '    "summary": "User said \\"salary missing\\": line1\nline2\twith tab",\n'
+    '    "solution": "Re-run payroll \\\\ sync."\n'
+    '}\n```'
+)
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalFieldParser()
+    order = []
+    for i in range(0, len(text), size):
+        order.extend(parser.feed(text[i:i + size]))
+    return parser, order
+
+
+def test_fields_in_stream_order_across_chunk_sizes():
+    for size in (1, 2, 3, 7, 64, len(OUTPUT)):
+        parser, order = feed_in_chunks(OUTPUT, size)
+        assert order == ["triage", "category", "summary", "solution"]
+        assert parser.fields["summary"] == 'User said "salary missing": line1\nline2\twith tab'
+        assert parser.fields["solution"] == "Re-run payroll \\ sync."
+
+
+def test_classification_available_before_long_fields():
+    parser = IncrementalFieldParser()
+    cut = OUTPUT.index('"summary"') + len('"summary": "User said')
+    parser.feed(OUTPUT[:cut])
+    assert parser.has("triage", "category")
+    assert "summary" not in parser.fields
+
+
+def test_raw_newline_in_value():
+    parser = IncrementalFieldParser()
+    parser.feed('{"triage": "L3", "category": "Payroll", "summary": "line1\nline2"}')
+    assert parser.fields["summary"] == "line1\nline2"